@@ -51,6 +51,10 @@ setup(
         "termcolor",
         "typing_extensions"
     ],
+    extras_require={
+        "async": ["aiohttp"],
+        "fast":  ["orjson", "ijson"],
+    },
     python_requires=">=3.7, <4",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -292,6 +292,8 @@ class Editor:
     def runCommandGlobal(self, command: str, position: Optional[Vec3iLike]=None, syncWithBuffer=False):
         """Executes one or multiple Minecraft commands (separated by newlines), ignoring self.transform.\n
         The leading "/" must be omitted.\n
+        Since commands can change arbitrary blocks, running one invalidates this editor's block
+        cache and marks its cached world slice (if any) as outdated.\n
         If buffering is enabled and <syncWithBuffer>=True, the command is deferred until after the
         next buffer flush.\n
         If <position> is provided, the command's execution position is set to <position>, ignoring
@@ -303,6 +305,10 @@ class Editor:
         if position is not None:
             command = f"execute positioned {' '.join(str(c) for c in position)} run {command}"
 
+        # Commands can modify arbitrary blocks, so the block cache and the cached world slice can
+        # no longer be trusted.
+        self._invalidateBlockCaches()
+
         if self.buffering and syncWithBuffer:
             self._commandBuffer.append(command)
             return
@@ -311,6 +317,13 @@ class Editor:
             logger.error("Server returned error upon running command:\n  %s", result[0][1])
 
 
+    def _invalidateBlockCaches(self):
+        """Invalidates the block cache and the cached world slice (if any)."""
+        self._cache.clear()
+        if self._worldSliceDecay is not None:
+            self._worldSliceDecay.fill(True)
+
+
     def getBuildArea(self) -> Box:
         """Returns the build area that was specified by /setbuildarea in-game.\n
         The build area is always in **global coordinates**; self.transform is ignored."""
@@ -487,16 +500,20 @@ class Editor:
 
     def flushBuffer(self):
         """Flushes the block placement buffer.\n
-        If multithreaded buffer flushing is enabled, the worker threads can be awaited with
-        awaitBufferFlushes()."""
+        All buffered blocks are sent to the GDMC HTTP interface in a single request, in the order
+        in which they were buffered.\n
+        Returns the list of (success, result)-tuples for the placed blocks (one per block, in
+        buffer order), unless multithreaded buffer flushing is enabled, in which case None is
+        returned. The worker threads can be awaited with awaitBufferFlushes()."""
 
         def flush(blockBuffer: Dict[ivec3, Block], commandBuffer: List[str]):
             # Flush block buffer
+            blockResponse = []
             if blockBuffer:
-                response = interface.placeBlocks(blockBuffer.items(), dimension=self.dimension, doBlockUpdates=self._bufferDoBlockUpdates, spawnDrops=self.spawnDrops, retries=self.retries, timeout=self.timeout, host=self.host)
+                blockResponse = interface.placeBlocks(blockBuffer.items(), dimension=self.dimension, doBlockUpdates=self._bufferDoBlockUpdates, spawnDrops=self.spawnDrops, retries=self.retries, timeout=self.timeout, host=self.host)
                 blockBuffer.clear()
 
-                for entry in response:
+                for entry in blockResponse:
                     if not entry[0]:
                         logger.error("Server returned error upon placing buffered block:\n  %s", entry[1])
 
@@ -509,6 +526,14 @@ class Editor:
                     if not entry[0]:
                         logger.error("Server returned error upon running buffered command:\n  %s", entry[1])
 
+            return blockResponse
+
+        # Commands deferred with syncWithBuffer only execute now, so the block caches must be
+        # invalidated again: any blocks cached since the command was queued would go stale the
+        # moment it runs.
+        if self._commandBuffer:
+            self._invalidateBlockCaches()
+
         if self._multithreading:
             # Clean up finished buffer flush futures
             self._bufferFlushFutures = [
@@ -528,9 +553,10 @@ class Editor:
             # Empty the buffers (the thread has copies of the references)
             self._buffer = {}
             self._commandBuffer = []
+            return None
 
         else: # No multithreading
-            flush(self._buffer, self._commandBuffer)
+            return flush(self._buffer, self._commandBuffer)
 
 
     def awaitBufferFlushes(self, timeout: Optional[float] = None):
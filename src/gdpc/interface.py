@@ -4,18 +4,24 @@ It is recommended to use the higher-level `editor.Editor` class instead.
 """
 
 
-from typing import Sequence, Tuple, Optional, List, Dict, Any, Union
-from functools import partial
+from typing import Iterable, Sequence, Tuple, Optional, List, Dict, Any, Union
+from concurrent import futures
+import socket
 import time
+import random
 from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import logging
 import json
 import io
+import warnings
 
 from glm import ivec3
 from nbt import nbt
 import requests
-from requests.exceptions import ConnectionError as RequestConnectionError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestConnectionError, Timeout as RequestTimeout, ChunkedEncodingError
 
 from . import __url__
 from .utils import withRetries
@@ -30,20 +36,139 @@ DEFAULT_HOST = "http://localhost:9000"
 logger = logging.getLogger(__name__)
 
 
-def _onRequestRetry(e: Exception, retriesLeft: int):
+# orjson is an optional dependency (installable as gdpc[fast]): it parses the large list-of-dicts
+# payloads of endpoints like /blocks several times faster than the standard library.
+try:
+    import orjson
+    def _responseJson(response: requests.Response) -> Any:
+        return orjson.loads(response.content)
+except ImportError:
+    def _responseJson(response: requests.Response) -> Any:
+        return response.json()
+
+# ijson is likewise optional (also in gdpc[fast]): it allows parsing a response incrementally
+# instead of materializing the entire payload in memory at once.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Shared header dicts, so that the endpoint functions don't rebuild identical dicts on every call.
+# These must not be mutated.
+_HEADERS_GZIP        = {"Accept-Encoding": "gzip, deflate"}
+_HEADERS_CHUNK_BYTES = {"Accept": "application/octet-stream", "Accept-Encoding": "gzip, deflate"}
+_HEADERS_CHUNK_TEXT  = {"Accept": "text/plain",               "Accept-Encoding": "gzip, deflate"}
+
+
+class _SocketOptionsAdapter(HTTPAdapter):
+    """HTTPAdapter that applies latency-oriented socket options to its connections.\n
+    TCP_NODELAY disables Nagle's algorithm, which can otherwise delay the many small request
+    bodies this interface sends by tens of milliseconds each (urllib3 sets it by default, but we
+    don't want to depend on that). SO_KEEPALIVE keeps the pooled connection from silently going
+    stale between bursts of requests."""
+
+    _socketOptions = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY,  1),
+        (socket.SOL_SOCKET,  socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self._socketOptions
+        super().init_poolmanager(*args, **kwargs)
+
+
+# All requests go through a shared Session, so that the underlying TCP connection to the GDMC HTTP
+# interface is kept alive and re-used instead of being re-established on every call.
+_session = requests.Session()
+_adapter = _SocketOptionsAdapter(pool_connections=2, pool_maxsize=32)
+_session.mount("http://",  _adapter)
+_session.mount("https://", _adapter)
+
+
+# Retry delays use exponential backoff with full jitter: this recovers quickly from transient
+# blips, while avoiding synchronized retry storms when multiple clients hit the same server.
+_RETRY_BACKOFF_BASE = 0.5
+_RETRY_BACKOFF_CAP  = 30.0
+
+
+def _retryDelay(attempt: int):
+    return random.uniform(0, min(_RETRY_BACKOFF_CAP, _RETRY_BACKOFF_BASE * 2**attempt))
+
+
+def _retryAfterDelay(e: Exception) -> Optional[float]:
+    """Returns the delay requested by the server via a Retry-After header, if <e> carries one."""
+    response: Optional[requests.Response] = getattr(e, "response", None)
+    if response is None or not response.headers:
+        return None
+    retryAfter = response.headers.get("Retry-After")
+    if retryAfter is None:
+        return None
+    try:
+        delay = float(retryAfter)
+    except ValueError:
+        # Retry-After may also be an HTTP-date.
+        try:
+            delay = (parsedate_to_datetime(retryAfter) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(_RETRY_BACKOFF_CAP, delay))
+
+
+def _onRequestRetry(e: Exception, retriesLeft: int, attempt: int):
+    delay = _retryAfterDelay(e)
+    if delay is None:
+        delay = _retryDelay(attempt)
     logger.warning(
         "HTTP request failed!\n"
         "Request exception:\n"
         "%s\n"
-        "I'll retry in a bit (%i retries left).",
-        e, retriesLeft
+        "I'll retry in %.1f seconds (%i retries left).",
+        e, delay, retriesLeft
     )
-    time.sleep(3)
+    time.sleep(delay)
+
+
+def _dropNones(**kwargs) -> Dict[str, Any]:
+    """Returns a dict of the given keyword arguments, without the ones whose value is None.\n
+    Used to build query parameter dicts: requests would filter out None values anyway, but doing
+    it up front skips its generic filtering pass and keeps the dicts small."""
+    return {key: value for key, value in kwargs.items() if value is not None}
+
+
+def _encodeBody(data: Union[str, bytes, bytearray, memoryview]):
+    """Returns <data> encoded as UTF-8 if it is a string.\n
+    Pre-encoded data is passed through unchanged, so callers in hot loops can encode a repeated
+    body once and reuse it."""
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+class _TransientStatusError(Exception):
+    """A response with a status code that indicates a transient failure.\n
+    Only used internally, to route such responses through the retry loop."""
+    def __init__(self, response: requests.Response):
+        super().__init__(f"The server returned status code {response.status_code}")
+        self.response = response
+
+
+# Only transient failures are retried; anything else (such as a 4xx client error) would fail on
+# every retry as well, so we fail fast instead of sleeping through the remaining attempts.
+_TRANSIENT_STATUS_CODES = frozenset({429, 502, 503, 504})
+_TRANSIENT_EXCEPTIONS   = (RequestConnectionError, RequestTimeout, ChunkedEncodingError, _TransientStatusError)
 
 
 def _request(method: str, url: str, *args, retries: int, **kwargs):
+    def doRequest():
+        response = _session.request(method, url, *args, **kwargs)
+        if response.status_code in _TRANSIENT_STATUS_CODES:
+            raise _TransientStatusError(response)
+        return response
+
     try:
-        response = withRetries(partial(requests.request, method, url, *args, **kwargs), RequestConnectionError, retries=retries, onRetry=_onRequestRetry)
+        response = withRetries(doRequest, _TRANSIENT_EXCEPTIONS, retries=retries, onRetry=_onRequestRetry)
+    except _TransientStatusError as e:
+        # Retries have run out; hand the response to the caller like any other non-500 response.
+        response = e.response
     except RequestConnectionError as e:
         u = urlparse(url)
         raise exceptions.InterfaceConnectionError(
@@ -71,22 +196,88 @@ def getBlocks(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension:
     url = f"{host}/blocks"
     x, y, z = position
     dx, dy, dz = (None, None, None) if size is None else size
-    parameters = {
-        'x': x,
-        'y': y,
-        'z': z,
-        'dx': dx,
-        'dy': dy,
-        'dz': dz,
-        'includeState': True if includeState else None,
-        'includeData':  True if includeData  else None,
-        'dimension': dimension
-    }
-    response = _request("GET", url, params=parameters, retries=retries, timeout=timeout)
-    blockDicts: List[Dict[str, Any]] = response.json()
+    parameters = _dropNones(
+        x=x, y=y, z=z, dx=dx, dy=dy, dz=dz,
+        includeState=True if includeState else None,
+        includeData=True if includeData else None,
+        dimension=dimension,
+    )
+    response = _request("GET", url, params=parameters, headers=_HEADERS_GZIP, retries=retries, timeout=timeout)
+    blockDicts: List[Dict[str, Any]] = _responseJson(response)
     return [(ivec3(b["x"], b["y"], b["z"]), Block(b["id"], b.get("state", {}), b.get("data") if b.get("data") != "{}" else None)) for b in blockDicts]
 
 
+def getBlocksStreamed(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, includeState=True, includeData=True, retries=0, timeout=None, host=DEFAULT_HOST):
+    """Yields the blocks in the specified region, parsing the response incrementally.
+
+    Like getBlocks(), but returns a generator of (position, block)-tuples instead of a list. If
+    the optional `ijson` package is installed, the response is parsed while it is still being
+    received, which bounds peak memory use for very large regions and lets processing start
+    before the response finishes. Without `ijson`, the response is parsed in one go and the
+    blocks are still yielded lazily.
+
+    Note the trade-offs of streaming: the result can only be iterated once, and the underlying
+    HTTP connection stays in use until the generator is exhausted (or closed).
+    """
+    url = f"{host}/blocks"
+    x, y, z = position
+    dx, dy, dz = (None, None, None) if size is None else size
+    parameters = _dropNones(
+        x=x, y=y, z=z, dx=dx, dy=dy, dz=dz,
+        includeState=True if includeState else None,
+        includeData=True if includeData else None,
+        dimension=dimension,
+    )
+    response = _request("GET", url, params=parameters, headers=_HEADERS_GZIP, retries=retries, timeout=timeout, stream=ijson is not None)
+
+    def generate():
+        try:
+            if ijson is None:
+                blockDicts = _responseJson(response)
+            else:
+                response.raw.decode_content = True # Decompress, in case the response is encoded.
+                blockDicts = ijson.items(response.raw, "item")
+            for b in blockDicts:
+                yield (ivec3(b["x"], b["y"], b["z"]), Block(b["id"], b.get("state", {}), b.get("data") if b.get("data") != "{}" else None))
+        finally:
+            response.close()
+
+    return generate()
+
+
+def getBlocksParallel(position: Vec3iLike, size: Vec3iLike, dimension: Optional[str] = None, includeState=True, includeData=True, retries=0, timeout=None, host=DEFAULT_HOST, tileSize=16, workers=8):
+    """Returns the blocks in the specified region, using multiple concurrent requests.
+
+    The region is split into tiles of at most <tileSize> x <tileSize> blocks along the X and Z
+    axes (spanning the full Y range), which are requested concurrently with at most <workers>
+    threads. Since the server can serialize the tiles in parallel, this is considerably faster
+    than a single getBlocks() call for large regions. Regions that fit in a single tile are
+    simply fetched with getBlocks() directly.
+
+    All components of <size> must be positive.
+
+    Returns a list of (position, block)-tuples, like getBlocks(). The tuples are ordered
+    tile-by-tile; within a tile, they are in the order the server returns them.
+    """
+    x, y, z = position
+    dx, dy, dz = size
+    tiles = [
+        ((tileX, y, tileZ), (min(tileSize, x + dx - tileX), dy, min(tileSize, z + dz - tileZ)))
+        for tileX in range(x, x + dx, tileSize)
+        for tileZ in range(z, z + dz, tileSize)
+    ]
+
+    def getTile(tile):
+        tilePosition, tileSize_ = tile
+        return getBlocks(tilePosition, tileSize_, dimension=dimension, includeState=includeState, includeData=includeData, retries=retries, timeout=timeout, host=host)
+
+    if len(tiles) <= 1:
+        return getTile((position, size))
+
+    with futures.ThreadPoolExecutor(max_workers=min(workers, len(tiles))) as executor:
+        return [blockTuple for tileResult in executor.map(getTile, tiles) for blockTuple in tileResult]
+
+
 def getBiomes(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
     """Returns the biomes in the specified region.
 
@@ -99,17 +290,9 @@ def getBiomes(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension:
     url = f"{host}/biomes"
     x, y, z = position
     dx, dy, dz = (None, None, None) if size is None else size
-    parameters = {
-        'x': x,
-        'y': y,
-        'z': z,
-        'dx': dx,
-        'dy': dy,
-        'dz': dz,
-        'dimension': dimension
-    }
-    response = _request("GET", url, params=parameters, retries=retries, timeout=timeout)
-    biomeDicts: List[Dict[str, Any]] = response.json()
+    parameters = _dropNones(x=x, y=y, z=z, dx=dx, dy=dy, dz=dz, dimension=dimension)
+    response = _request("GET", url, params=parameters, headers=_HEADERS_GZIP, retries=retries, timeout=timeout)
+    biomeDicts: List[Dict[str, Any]] = _responseJson(response)
     return [(ivec3(b["x"], b["y"], b["z"]), str(b["id"])) for b in biomeDicts]
 
 
@@ -135,44 +318,80 @@ def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[s
     else:
         blockUpdateParams = {"doBlockUpdates": doBlockUpdates, "spawnDrops": spawnDrops}
 
-    parameters = {"dimension": dimension}
+    parameters = _dropNones(dimension=dimension)
     parameters.update(blockUpdateParams)
 
+    # This is the hottest client-side loop in GDPC. Builds usually place the same Block object at
+    # many positions (palettes, Editor's buffer), so the position-independent part of each entry
+    # is serialized once per distinct Block object and re-used. The cache is keyed on object
+    # identity (Block is not hashable) and holds a reference to the block, so an id can not be
+    # recycled for a new Block while the cache is alive.
+    dumps = json.dumps
+    fragmentCache: Dict[int, Tuple[Block, str]] = {}
+
+    def blockFragment(block: Block):
+        cached = fragmentCache.get(id(block))
+        if cached is None:
+            fragment = (
+                f'"id":"{block.id}"' +
+                (f',"state":{dumps(block.states, separators=(",",":"))}' if block.states else '') +
+                (f',"data":{repr(block.data)}' if block.data is not None else '') +
+                '}'
+            )
+            fragmentCache[id(block)] = (block, fragment)
+            return fragment
+        return cached[1]
+
     body = (
         "[" +
         ",".join(
-            '{' +
-            f'"x":{pos[0]},"y":{pos[1]},"z":{pos[2]},"id":"{block.id}"' +
-            (f',"state":{json.dumps(block.states, separators=(",",":"))}' if block.states else '') +
-            (f',"data":{repr(block.data)}' if block.data is not None else '') +
-            '}'
+            f'{{"x":{pos[0]},"y":{pos[1]},"z":{pos[2]},{blockFragment(block)}'
             for pos, block in blocks
         ) +
         "]"
     )
 
-    response = _request("PUT", url, data=bytes(body, "utf-8"), params=parameters, retries=retries, timeout=timeout)
+    response = _request("PUT", url, data=body.encode("utf-8"), params=parameters, retries=retries, timeout=timeout)
 
-    result: List[Tuple[bool, Union[int, str]]] = [("message" not in entry, entry.get("message", int(entry["status"]))) for entry in response.json()]
+    result: List[Tuple[bool, Union[int, str]]] = [("message" not in entry, entry.get("message", int(entry["status"]))) for entry in _responseJson(response)]
     return result
 
 
-def runCommand(command: str, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
+def runCommand(command: Union[str, bytes], dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
     """Executes one or multiple Minecraft commands (separated by newlines).
 
     The leading "/" must be omitted.
 
+    <command> may also be given as pre-encoded UTF-8 bytes, which skips the per-call encoding.
+    This is useful when running the same command many times.
+
     <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
 
     Returns a list of (success, result)-tuples, one for each command. If a command was succesful,
     result is its return value (if any). Otherwise, it is the error message.
     """
     url = f"{host}/command"
-    response = _request("POST", url, data=bytes(command, "utf-8"), params={'dimension': dimension}, retries=retries, timeout=timeout)
-    result: List[Tuple[bool, Optional[str]]] = [(bool(entry["status"]), entry.get("message")) for entry in response.json()]
+    response = _request("POST", url, data=_encodeBody(command), params=_dropNones(dimension=dimension), retries=retries, timeout=timeout)
+    result: List[Tuple[bool, Optional[str]]] = [(bool(entry["status"]), entry.get("message")) for entry in _responseJson(response)]
     return result
 
 
+def runCommands(commands: Iterable[str], dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
+    """Executes multiple Minecraft commands with a single request.
+
+    The leading "/" must be omitted. The commands may not contain newlines themselves.
+
+    Sending commands in bulk amortizes the HTTP round-trip over all of them, which is much faster
+    than calling runCommand() once per command. (The `Editor` class can do this transparently via
+    its command buffer.)
+
+    <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
+
+    Returns a list of (success, result)-tuples, one for each command, in the given order.
+    """
+    return runCommand("\n".join(commands), dimension=dimension, retries=retries, timeout=timeout, host=host)
+
+
 def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST):
     """Retrieves the build area that was specified with /setbuildarea in-game.
 
@@ -184,14 +403,15 @@ def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST):
     """
     response = _request("GET", f"{host}/buildarea", retries=retries, timeout=timeout)
 
-    if not response.ok or response.json() == -1:
+    # Only parse ok responses: error bodies may not be JSON at all (e.g. an HTML proxy page).
+    buildAreaJson = _responseJson(response) if response.ok else None
+    if not response.ok or buildAreaJson == -1:
         raise exceptions.BuildAreaNotSetError(
             "Failed to get the build area.\n"
             "Make sure to set the build area with /setbuildarea in-game.\n"
             "For example: /setbuildarea ~0 0 ~0 ~128 255 ~128"
         )
 
-    buildAreaJson = response.json()
     fromPoint = ivec3(
         buildAreaJson["xFrom"],
         buildAreaJson["yFrom"],
@@ -215,20 +435,25 @@ def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension:
     If <asBytes> is True, returns raw binary data. Otherwise, returns a human-readable
     representation.
 
+    The human-readable mode is deprecated: it makes the server stringify the NBT data, which
+    transfers much more data and blocks the server for longer than the binary mode. Prefer
+    <asBytes>=True and parse the result client-side (e.g. with the `nbt` package, like
+    `WorldSlice` does), stringifying only the parts you need.
+
     On error, returns the error message instead.
     """
+    if not asBytes:
+        warnings.warn(
+            "getChunks(asBytes=False) is deprecated. Use asBytes=True and parse the binary NBT "
+            "data client-side instead.",
+            DeprecationWarning, stacklevel=2
+        )
     url = f"{host}/chunks"
     x, z = position
     dx, dz = (None, None) if size is None else size
-    parameters = {
-        "x": x,
-        "z": z,
-        "dx": dx,
-        "dz": dz,
-        "dimension": dimension,
-    }
-    acceptType = "application/octet-stream" if asBytes else "text/plain"
-    response = _request("GET", url, params=parameters, headers={"Accept": acceptType}, retries=retries, timeout=timeout)
+    parameters = _dropNones(x=x, z=z, dx=dx, dz=dz, dimension=dimension)
+    headers = _HEADERS_CHUNK_BYTES if asBytes else _HEADERS_CHUNK_TEXT
+    response = _request("GET", url, params=parameters, headers=headers, retries=retries, timeout=timeout)
     return response.content if asBytes else response.text
 
 
@@ -266,18 +491,14 @@ def placeStructure(structureData: Union[bytes, nbt.NBTFile], position: Vec3iLike
     else:
         mirrorArg = None
     pivotX, pivotY, pivotZ = (None, None, None) if pivot is None else pivot
-    parameters = {
-        'x': x,
-        'y': y,
-        'z': z,
-        'mirror': mirrorArg,
-        'rotate': rotate,
-        'pivotx': pivotX,
-        'pivoty': pivotY,
-        'pivotz': pivotZ,
-        'dimension': dimension,
-        'entities': includeEntities,
-    }
+    parameters = _dropNones(
+        x=x, y=y, z=z,
+        mirror=mirrorArg,
+        rotate=rotate,
+        pivotx=pivotX, pivoty=pivotY, pivotz=pivotZ,
+        dimension=dimension,
+        entities=includeEntities,
+    )
     if customFlags != "":
         parameters['customFlags'] = customFlags
     else:
@@ -285,7 +506,7 @@ def placeStructure(structureData: Union[bytes, nbt.NBTFile], position: Vec3iLike
         parameters['spawnDrops'] = spawnDrops
 
     response = _request(method="POST", url=url, data=structureData, params=parameters, retries=retries, timeout=timeout)
-    return response.json()
+    return _responseJson(response)
 
 
 def getStructure(position: Vec3iLike, size: Vec3iLike, dimension: Optional[str] = None, includeEntities: Optional[bool] = None, returnCompressed: Optional[bool] = True, retries=0, timeout=None, host=DEFAULT_HOST):
@@ -303,17 +524,12 @@ def getStructure(position: Vec3iLike, size: Vec3iLike, dimension: Optional[str]
     url = f"{host}/structure"
     x, y, z = position
     dx, dy, dz = size
-    parameters = {
-        'x': x,
-        'y': y,
-        'z': z,
-        'dx': dx,
-        'dy': dy,
-        'dz': dz,
-        'dimension': dimension,
-        'entities': includeEntities,
-    }
-    headers = {'Accept-Encoding': 'gzip'} if returnCompressed is True else None
+    parameters = _dropNones(
+        x=x, y=y, z=z, dx=dx, dy=dy, dz=dz,
+        dimension=dimension,
+        entities=includeEntities,
+    )
+    headers = _HEADERS_GZIP if returnCompressed is True else None
 
     response = _request(method="GET", url=url, params=parameters, headers=headers, retries=retries, timeout=timeout)
     return response.content
@@ -321,24 +537,16 @@ def getStructure(position: Vec3iLike, size: Vec3iLike, dimension: Optional[str]
 
 def getEntities(selector: Optional[str] = None, includeData: bool = True, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
     url = f'{host}/entities'
-    parameters = {
-        'selector': selector,
-        'dimension': dimension,
-        'includeData': includeData,
-    }
+    parameters = _dropNones(selector=selector, dimension=dimension, includeData=includeData)
     response = _request(method='GET', url=url, params=parameters, retries=retries, timeout=timeout)
-    return response.json()
+    return _responseJson(response)
 
 
 def getPlayers(selector: Optional[str] = None, includeData: bool = True, dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
     url = f'{host}/players'
-    parameters = {
-        'selector': selector,
-        'dimension': dimension,
-        'includeData': includeData,
-    }
+    parameters = _dropNones(selector=selector, dimension=dimension, includeData=includeData)
     response = _request(method='GET', url=url, params=parameters, retries=retries, timeout=timeout)
-    return response.json()
+    return _responseJson(response)
 
 
 def getVersion(retries=0, timeout=None, host=DEFAULT_HOST):
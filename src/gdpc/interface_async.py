@@ -0,0 +1,305 @@
+"""Provides asynchronous wrappers for the endpoints of the GDMC HTTP interface.
+
+This module mirrors the most commonly used functions of the `interface` module, but performs its
+requests through `aiohttp` instead of `requests`. This allows multiple requests to be in flight
+concurrently, which can significantly speed up bulk world reads.
+
+Using this module requires the optional `aiohttp` dependency, which can be installed with
+``pip install gdpc[async]``.
+"""
+
+
+from typing import Sequence, Tuple, Optional, List, Dict, Any, Union
+import asyncio
+import logging
+import json
+import warnings
+
+from glm import ivec3
+import aiohttp
+
+from . import __url__
+from .vector_tools import Vec2iLike, Vec3iLike, Box
+from .block import Block
+from . import exceptions
+from . import interface
+from .interface import DEFAULT_HOST
+
+
+logger = logging.getLogger(__name__)
+
+
+# The ClientSession is created lazily, because it must be created from within a running event
+# loop. It is shared between all calls so that connections are pooled and kept alive.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _getSession() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+        )
+    return _session
+
+
+async def closeSession():
+    """Closes the shared aiohttp session, if one was created.\n
+    Call this before your program's event loop shuts down to release the pooled connections."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _queryParams(**kwargs) -> Dict[str, Any]:
+    # aiohttp does not accept None or bool query parameter values, so drop the former and
+    # stringify the latter.
+    return {
+        key: (str(value).lower() if isinstance(value, bool) else value)
+        for key, value in kwargs.items() if value is not None
+    }
+
+
+async def _onRequestRetry(e: Exception, retriesLeft: int, attempt: int):
+    delay = interface._retryAfterDelay(e)
+    if delay is None:
+        delay = interface._retryDelay(attempt)
+    logger.warning(
+        "HTTP request failed!\n"
+        "Request exception:\n"
+        "%s\n"
+        "I'll retry in %.1f seconds (%i retries left).",
+        e, delay, retriesLeft
+    )
+    await asyncio.sleep(delay)
+
+
+class _TransientStatusError(Exception):
+    """A response with a status code that indicates a transient failure.\n
+    Only used internally, to route such responses through the retry loop."""
+    def __init__(self, response: aiohttp.ClientResponse):
+        super().__init__(f"The server returned status code {response.status}")
+        self.response = response
+
+
+# Like the sync interface, only transient failures are retried; anything else fails fast.
+_TRANSIENT_EXCEPTIONS = (aiohttp.ClientConnectionError, asyncio.TimeoutError, aiohttp.ClientPayloadError, _TransientStatusError)
+
+
+async def _request(method: str, url: str, *args, retries: int, **kwargs):
+    session = _getSession()
+    attempt = 0
+    while True:
+        try:
+            response = await session.request(method, url, *args, **kwargs)
+            if response.status in interface._TRANSIENT_STATUS_CODES and retries > 0:
+                raise _TransientStatusError(response)
+        except _TRANSIENT_EXCEPTIONS as e:
+            if retries == 0:
+                # Only _TransientStatusError is raised with retries left, so e is a real exception here.
+                if isinstance(e, aiohttp.ClientConnectionError):
+                    raise exceptions.InterfaceConnectionError(
+                        f"Could not connect to the GDMC HTTP interface at {url}.\n"
+                         "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
+                         "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
+                        f"See {__url__}/README.md for more information."
+                    ) from e
+                raise e
+            await _onRequestRetry(e, retries, attempt)
+            retries -= 1
+            attempt += 1
+            continue
+        break
+
+    if response.status == 500:
+        raise exceptions.InterfaceInternalError("The GDMC HTTP interface reported an internal server error (500)")
+
+    return response
+
+
+async def getBlocks(position: Vec3iLike, size: Optional[Vec3iLike] = None, dimension: Optional[str] = None, includeState=True, includeData=True, retries=0, timeout=None, host=DEFAULT_HOST):
+    """Returns the blocks in the specified region.
+
+    <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
+
+    Returns a list of (position, block)-tuples.
+
+    If a set of coordinates is invalid, the returned block ID will be "minecraft:void_air".
+    """
+    url = f"{host}/blocks"
+    x, y, z = position
+    dx, dy, dz = (None, None, None) if size is None else size
+    parameters = _queryParams(
+        x=x, y=y, z=z, dx=dx, dy=dy, dz=dz,
+        includeState=True if includeState else None,
+        includeData=True if includeData else None,
+        dimension=dimension,
+    )
+    response = await _request("GET", url, params=parameters, retries=retries, timeout=timeout)
+    blockDicts: List[Dict[str, Any]] = await response.json()
+    return [(ivec3(b["x"], b["y"], b["z"]), Block(b["id"], b.get("state", {}), b.get("data") if b.get("data") != "{}" else None)) for b in blockDicts]
+
+
+async def getBlocksBatched(regions: Sequence[Tuple[Vec3iLike, Optional[Vec3iLike]]], dimension: Optional[str] = None, includeState=True, includeData=True, retries=0, timeout=None, host=DEFAULT_HOST, maxConcurrentRequests=16):
+    """Retrieves multiple block regions concurrently.
+
+    Each element of <regions> should be a (position, size)-tuple as accepted by getBlocks().
+    At most <maxConcurrentRequests> requests are in flight at the same time.
+
+    Returns a list with one getBlocks() result per region, in the same order as <regions>.
+    """
+    semaphore = asyncio.Semaphore(maxConcurrentRequests)
+
+    async def getRegion(position: Vec3iLike, size: Optional[Vec3iLike]):
+        async with semaphore:
+            return await getBlocks(position, size, dimension=dimension, includeState=includeState, includeData=includeData, retries=retries, timeout=timeout, host=host)
+
+    return await asyncio.gather(*(getRegion(position, size) for position, size in regions))
+
+
+async def placeBlocks(blocks: Sequence[Tuple[Vec3iLike, Block]], dimension: Optional[str] = None, doBlockUpdates=True, spawnDrops=False, customFlags: str = "", retries=0, timeout=None, host=DEFAULT_HOST):
+    """Places blocks in the world.
+
+    Each element of <blocks> should be a tuple (position, block). Empty blocks (blocks without an
+    id) are not allowed.
+
+    <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
+
+    The <doBlockUpdates>, <spawnDrops> and <customFlags> parameters control block update
+    behavior. See the GDMC HTTP API documentation for more info.
+
+    Returns a list of (success, result)-tuples, one for each block. If a block placement was
+    successful, result will be 1 if the block changed, or 0 otherwise. If a block placement failed,
+    result will be the error message.
+    """
+    url = f"{host}/blocks"
+
+    if customFlags != "":
+        parameters = _queryParams(dimension=dimension, customFlags=customFlags)
+    else:
+        parameters = _queryParams(dimension=dimension, doBlockUpdates=doBlockUpdates, spawnDrops=spawnDrops)
+
+    # This is the hottest client-side loop in GDPC. Builds usually place the same Block object at
+    # many positions (palettes, Editor's buffer), so the position-independent part of each entry
+    # is serialized once per distinct Block object and re-used. The cache is keyed on object
+    # identity (Block is not hashable) and holds a reference to the block, so an id can not be
+    # recycled for a new Block while the cache is alive.
+    dumps = json.dumps
+    fragmentCache: Dict[int, Tuple[Block, str]] = {}
+
+    def blockFragment(block: Block):
+        cached = fragmentCache.get(id(block))
+        if cached is None:
+            fragment = (
+                f'"id":"{block.id}"' +
+                (f',"state":{dumps(block.states, separators=(",",":"))}' if block.states else '') +
+                (f',"data":{repr(block.data)}' if block.data is not None else '') +
+                '}'
+            )
+            fragmentCache[id(block)] = (block, fragment)
+            return fragment
+        return cached[1]
+
+    body = (
+        "[" +
+        ",".join(
+            f'{{"x":{pos[0]},"y":{pos[1]},"z":{pos[2]},{blockFragment(block)}'
+            for pos, block in blocks
+        ) +
+        "]"
+    )
+
+    response = await _request("PUT", url, data=bytes(body, "utf-8"), params=parameters, retries=retries, timeout=timeout)
+
+    result: List[Tuple[bool, Union[int, str]]] = [("message" not in entry, entry.get("message", int(entry["status"]))) for entry in await response.json()]
+    return result
+
+
+async def runCommand(command: Union[str, bytes], dimension: Optional[str] = None, retries=0, timeout=None, host=DEFAULT_HOST):
+    """Executes one or multiple Minecraft commands (separated by newlines).
+
+    The leading "/" must be omitted.
+
+    <command> may also be given as pre-encoded UTF-8 bytes, which skips the per-call encoding.
+
+    <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
+
+    Returns a list of (success, result)-tuples, one for each command. If a command was succesful,
+    result is its return value (if any). Otherwise, it is the error message.
+    """
+    url = f"{host}/command"
+    response = await _request("POST", url, data=interface._encodeBody(command), params=_queryParams(dimension=dimension), retries=retries, timeout=timeout)
+    result: List[Tuple[bool, Optional[str]]] = [(bool(entry["status"]), entry.get("message")) for entry in await response.json()]
+    return result
+
+
+async def getBuildArea(retries=0, timeout=None, host=DEFAULT_HOST):
+    """Retrieves the build area that was specified with /setbuildarea in-game.
+
+    Fails if the build area was not specified yet.
+
+    Returns (success, result).
+    If a build area was specified, result is the box describing the build area.
+    Otherwise, result is the error message string.
+    """
+    response = await _request("GET", f"{host}/buildarea", retries=retries, timeout=timeout)
+
+    # Only parse ok responses: aiohttp raises for non-JSON content types, and error bodies may
+    # not be JSON at all (e.g. an HTML proxy page).
+    buildAreaJson = await response.json() if response.ok else None
+    if not response.ok or buildAreaJson == -1:
+        raise exceptions.BuildAreaNotSetError(
+            "Failed to get the build area.\n"
+            "Make sure to set the build area with /setbuildarea in-game.\n"
+            "For example: /setbuildarea ~0 0 ~0 ~128 255 ~128"
+        )
+
+    fromPoint = ivec3(
+        buildAreaJson["xFrom"],
+        buildAreaJson["yFrom"],
+        buildAreaJson["zFrom"]
+    )
+    toPoint = ivec3(
+        buildAreaJson["xTo"],
+        buildAreaJson["yTo"],
+        buildAreaJson["zTo"]
+    )
+    return Box.between(fromPoint, toPoint)
+
+
+async def getChunks(position: Vec2iLike, size: Optional[Vec2iLike] = None, dimension: Optional[str] = None, asBytes=False, retries=0, timeout=None, host=DEFAULT_HOST):
+    """Returns raw chunk data.
+
+    <position> specifies the position in chunk coordinates, and <size> specifies how many chunks
+    to get in each axis (default 1).
+    <dimension> can be one of {"overworld", "the_nether", "the_end"} (default "overworld").
+
+    If <asBytes> is True, returns raw binary data. Otherwise, returns a human-readable
+    representation.
+
+    The human-readable mode is deprecated: it makes the server stringify the NBT data, which
+    transfers much more data and blocks the server for longer than the binary mode. Prefer
+    <asBytes>=True and parse the result client-side (e.g. with the `nbt` package, like
+    `WorldSlice` does), stringifying only the parts you need.
+
+    On error, returns the error message instead.
+    """
+    if not asBytes:
+        warnings.warn(
+            "getChunks(asBytes=False) is deprecated. Use asBytes=True and parse the binary NBT "
+            "data client-side instead.",
+            DeprecationWarning, stacklevel=2
+        )
+    url = f"{host}/chunks"
+    x, z = position
+    dx, dz = (None, None) if size is None else size
+    parameters = _queryParams(x=x, z=z, dx=dx, dz=dz, dimension=dimension)
+    acceptType = "application/octet-stream" if asBytes else "text/plain"
+    response = await _request("GET", url, params=parameters, headers={"Accept": acceptType}, retries=retries, timeout=timeout)
+    return await response.read() if asBytes else await response.text()
+
+
+async def getVersion(retries=0, timeout=None, host=DEFAULT_HOST):
+    """Returns the Minecraft version as a string."""
+    return await (await _request("GET", f"{host}/version", retries=retries, timeout=timeout)).text()
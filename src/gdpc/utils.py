@@ -1,6 +1,6 @@
 """Various utilities that are not specific to GDPC"""
 
-from typing import Any, Generator, Sequence, TypeVar, Generic, Callable, Iterable, OrderedDict, Union
+from typing import Any, Generator, Sequence, Tuple, TypeVar, Generic, Callable, Iterable, OrderedDict, Union
 import time
 from pathlib import Path
 
@@ -51,15 +51,18 @@ def normalized(a, order=2, axis=-1):
 
 def withRetries(
     function:      Callable[[], T],
-    exceptionType: type                             = Exception,
-    retries:       int                              = 1,
-    onRetry:       Callable[[Exception, int], None] = lambda *_: time.sleep(1),
-    reRaise:       bool                             = True
+    exceptionType: Union[type, Tuple[type, ...]]         = Exception,
+    retries:       int                                   = 1,
+    onRetry:       Callable[[Exception, int, int], None] = lambda *_: time.sleep(1),
+    reRaise:       bool                                  = True
 ):
     """Retries <function> up to <retries> times if an exception occurs.\n
-    Before retrying, calls <onRetry>(last exception, remaining retries).
+    Before retrying, calls <onRetry>(last exception, remaining retries, attempt index).
+    The attempt index starts at 0 and increases by one for each retry, which allows the callback
+    to implement a backoff policy.
     The default callback sleeps for one second.\n
     If the retries have ran out and <reRaise> is True, the last exception is re-raised."""
+    attempt = 0
     while True:
         try:
             return function()
@@ -68,8 +71,9 @@ def withRetries(
                 if reRaise:
                     raise e
                 return None
-            onRetry(e, retries)
+            onRetry(e, retries, attempt)
             retries -= 1
+            attempt += 1
 
 
 def isIterable(value):